@@ -3,17 +3,12 @@ Prompts for the conversation agent
 """
 
 import datetime
+import functools
 
-def get_system_prompt() -> str:
-    """
-    Get the system prompt for the appointment scheduling assistant
-    
-    Returns:
-        System prompt string
-    """
-    current_date = datetime.date.today()
-    
-    return f"""
+# Static part of the system prompt. It must stay byte-identical between
+# requests so the provider's prompt cache can reuse it; per-day content
+# belongs in _DATE_PROMPT_TEMPLATE, which is appended at the end.
+_STATIC_PROMPT = """
 Do not generate user responses on your own and avoid repeating questions.
 
 You are a helpful appointment scheduling assistant for a hospital clinic. Your task is to help users schedule medical consultations.
@@ -39,7 +34,34 @@ Preferred Time:
 Phone Number: 
 Email Address: 
 
-Consider the date/day relative to {current_date} and display the date accordingly. Make sure the chosen day is not a Sunday.
+Make sure the chosen day is not a Sunday.
 If the preferred time is not available, inform the user and ask for an alternative time.
 Once all information is confirmed, respond with "Your appointment has been scheduled. You will receive a confirmation email shortly."
-"""
\ No newline at end of file
+"""
+
+# Dynamic tail of the system prompt; {current_date} is filled in once per day
+_DATE_PROMPT_TEMPLATE = """
+Today's date is {current_date}. Consider the date/day relative to {current_date} and display the date accordingly.
+"""
+
+@functools.lru_cache(maxsize=2)
+def _cached_prompt(day: datetime.date) -> str:
+    """
+    Render the system prompt for a given day
+    
+    Args:
+        day: Date the prompt is relative to
+    
+    Returns:
+        System prompt string
+    """
+    return _STATIC_PROMPT + _DATE_PROMPT_TEMPLATE.format(current_date=day)
+
+def get_system_prompt() -> str:
+    """
+    Get the system prompt for the appointment scheduling assistant
+    
+    Returns:
+        System prompt string
+    """
+    return _cached_prompt(datetime.date.today())
@@ -2,8 +2,13 @@
 Tools for the appointment scheduling agent
 """
 
+import asyncio
+import atexit
+import itertools
 import logging
 import json
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, Any, Callable
 
 from langchain_core.tools import StructuredTool
@@ -14,6 +19,70 @@ from app.api.email_service import EmailService
 
 logger = get_logger(__name__)
 
+# Maps the "Key: value" labels of the appointment info to field names
+_FIELD_KEYS = {
+    "patient name": "name",
+    "consultation type": "consultation",
+    "reason for visit": "reason",
+    "preferred date": "date_str",
+    "preferred time": "time_str",
+    "phone number": "phone",
+    "email address": "email",
+}
+
+# (label with colon, field name) pairs for matching labels anywhere in a line
+_FIELD_LABELS = tuple((f"{label}:", key) for label, key in _FIELD_KEYS.items())
+
+# Fallback confirmation numbers when Calendly does not return an event ID;
+# seeded from the start time so numbers are unique across restarts
+_APPT_COUNTER = itertools.count(int(time.time()))
+
+# Confirmation emails are sent in the background so SMTP round trips do not
+# delay the reply to the patient
+_EMAIL_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="email")
+atexit.register(_EMAIL_POOL.shutdown, wait=True)
+
+def _log_email_result(future: Future, recipient: str) -> None:
+    """
+    Log the outcome of a background confirmation email
+    
+    Args:
+        future: Future returned by the email pool
+        recipient: Recipient email address
+    """
+    try:
+        if not future.result():
+            logger.warning(f"Failed to send confirmation email to {recipient}")
+    except Exception as e:
+        logger.error(f"Error sending confirmation email to {recipient}: {str(e)}")
+
+def _parse_appointment_info(appointment_info: str) -> Dict[str, str]:
+    """
+    Parse the "Key: value" fields of the appointment info
+    
+    Labels are found anywhere in a line, so prefixes like
+    "Schedule this hospital appointment: " or "1. " are ignored.
+    The first non-empty value for each field wins.
+    
+    Args:
+        appointment_info: Appointment info text
+    
+    Returns:
+        Dictionary mapping field names to values
+    """
+    fields = {}
+    for line in appointment_info.splitlines():
+        lowered = line.lower()
+        for label, key in _FIELD_LABELS:
+            if fields.get(key):
+                continue
+            
+            start = lowered.find(label)
+            if start != -1:
+                fields[key] = line[start + len(label):].strip()
+    
+    return fields
+
 def create_scheduling_tool(calendly_api: CalendlyAPI, email_service: EmailService) -> StructuredTool:
     """
     Create a structured tool for scheduling appointments
@@ -44,25 +113,16 @@ def create_scheduling_tool(calendly_api: CalendlyAPI, email_service: EmailServic
         """
         try:
             # Parse the appointment info
-            import re
-            
-            # Extract fields using regular expressions
-            name_match = re.search(r'Patient Name:\s*(.*?)$', appointment_info, re.MULTILINE)
-            consultation_match = re.search(r'Consultation Type:\s*(.*?)$', appointment_info, re.MULTILINE)
-            reason_match = re.search(r'Reason for Visit:\s*(.*?)$', appointment_info, re.MULTILINE)
-            date_match = re.search(r'Preferred Date:\s*(.*?)$', appointment_info, re.MULTILINE)
-            time_match = re.search(r'Preferred Time:\s*(.*?)$', appointment_info, re.MULTILINE)
-            phone_match = re.search(r'Phone Number:\s*(.*?)$', appointment_info, re.MULTILINE)
-            email_match = re.search(r'Email Address:\s*(.*?)$', appointment_info, re.MULTILINE)
+            fields = _parse_appointment_info(appointment_info)
             
             # Extract the information
-            name = name_match.group(1) if name_match else ""
-            consultation = consultation_match.group(1) if consultation_match else ""
-            reason = reason_match.group(1) if reason_match else ""
-            date_str = date_match.group(1) if date_match else ""
-            time_str = time_match.group(1) if time_match else ""
-            phone = phone_match.group(1) if phone_match else ""
-            email = email_match.group(1) if email_match else ""
+            name = fields.get("name", "")
+            consultation = fields.get("consultation", "")
+            reason = fields.get("reason", "")
+            date_str = fields.get("date_str", "")
+            time_str = fields.get("time_str", "")
+            phone = fields.get("phone", "")
+            email = fields.get("email", "")
             
             # Validate required fields
             if not all([name, consultation, reason, date_str, time_str, phone, email]):
@@ -108,19 +168,17 @@ def create_scheduling_tool(calendly_api: CalendlyAPI, email_service: EmailServic
             if not event_result["success"]:
                 return f"There was an error scheduling your appointment: {event_result.get('error', 'Unknown error')}. Please try again later."
             
-            # Send confirmation email
-            email_result = email_service.send_confirmation_email(event_data)
-            
-            if not email_result:
-                logger.warning(f"Failed to send confirmation email to {email}")
+            # Send confirmation email in the background
+            email_future = _EMAIL_POOL.submit(email_service.send_confirmation_email, event_data)
+            email_future.add_done_callback(lambda future: _log_email_result(future, email))
             
             # Return success message
-            confirmation_id = event_result["data"].get("id", f"APPT-{hash(name + date_str + time_str) % 100000}")
+            confirmation_id = event_result["data"].get("id") or f"APPT-{next(_APPT_COUNTER):08x}"
             
             return (
                 f"Your appointment for {consultation} has been confirmed for {date_str} at {time_str}. "
                 f"Your confirmation number is {confirmation_id}. "
-                f"A confirmation email has been sent to {email}. "
+                f"A confirmation email will be sent to {email} shortly. "
                 f"Please arrive 15 minutes before your scheduled time."
             )
         
@@ -129,9 +187,26 @@ def create_scheduling_tool(calendly_api: CalendlyAPI, email_service: EmailServic
             logger.error(error_msg)
             return error_msg
     
+    async def aschedule_appointment(appointment_info: str) -> str:
+        """
+        Async variant of schedule_appointment for async agent execution.
+        
+        The Calendly calls are blocking, so they run in a worker thread to keep
+        the event loop free while the booking is in flight.
+        
+        Args:
+            appointment_info: String containing appointment details
+        
+        Returns:
+            Confirmation message or error
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, schedule_appointment, appointment_info)
+    
     # Create and return the tool
     return StructuredTool.from_function(
         func=schedule_appointment,
+        coroutine=aschedule_appointment,
         name="schedule_hospital_appointment",
         description="Schedule a hospital appointment using Calendly with the provided patient information"
     )
\ No newline at end of file
@@ -5,13 +5,40 @@ Calendly API integration for the Hospital Appointment System
 import os
 import logging
 import requests
+import time
 import datetime
 from typing import Dict, List, Any, Optional, Tuple
 
-from config.settings import CALENDLY_BASE_URL, get_calendly_headers, SPECIALTY_EVENT_TYPES
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.utils.date_parser import parse_date, parse_time
+from config.settings import (
+    CALENDLY_BASE_URL,
+    CALENDLY_AVAILABILITY_CACHE_TTL,
+    CALENDLY_EVENT_TYPES_CACHE_TTL,
+    CALENDLY_CACHE_MAX_SIZE,
+    CALENDLY_REQUEST_TIMEOUT,
+    CALENDLY_MAX_RETRIES,
+    get_calendly_headers,
+    SPECIALTY_EVENT_TYPES,
+)
 
 logger = logging.getLogger(__name__)
 
+def _parse_slot_time(start_time: str) -> datetime.datetime:
+    """
+    Parse a Calendly slot start time into an aware UTC datetime
+    
+    Args:
+        start_time: ISO 8601 timestamp, e.g. "2025-03-10T14:00:00.000000Z"
+    
+    Returns:
+        Timezone-aware datetime in UTC
+    """
+    slot_time = datetime.datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+    return slot_time.astimezone(datetime.timezone.utc)
+
 class CalendlyAPI:
     """Calendly API client for managing appointments"""
     
@@ -20,6 +47,86 @@ class CalendlyAPI:
         self.base_url = CALENDLY_BASE_URL
         self.headers = get_calendly_headers()
         self.user_uri = os.getenv('CALENDLY_USER_URI')
+        
+        # Specialty to event type lookup, defaulting to general medicine
+        self._spec_types = SPECIALTY_EVENT_TYPES
+        self._default_spec = SPECIALTY_EVENT_TYPES["General Medicine"]
+        
+        # HTTP session, created on first use
+        self._session: Optional[requests.Session] = None
+        
+        # In-process response caches: key -> (expiry timestamp, value)
+        self._event_types_cache: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+        # Available times are cached as parsed (start datetime, slot) pairs
+        self._avail_cache: Dict[Tuple[str, str], Tuple[float, List[Tuple[datetime.datetime, Dict[str, Any]]]]] = {}
+    
+    @property
+    def session(self) -> requests.Session:
+        """
+        Get the shared HTTP session for Calendly API calls
+        
+        Reuses connections (keep-alive) across API calls; only idempotent
+        requests are retried so a booking is never submitted twice.
+        
+        Returns:
+            Configured requests session
+        """
+        if self._session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=16,
+                max_retries=Retry(total=CALENDLY_MAX_RETRIES, backoff_factor=0.2)
+            )
+            session.mount("https://", adapter)
+            self._session = session
+        
+        return self._session
+    
+    def _get_cached_available_times(self, key: Tuple[str, str]) -> Optional[List[Tuple[datetime.datetime, Dict[str, Any]]]]:
+        """
+        Get cached available times if they have not expired
+        
+        Args:
+            key: Tuple of (event_type_id, date_str)
+        
+        Returns:
+            Cached list of (start datetime, slot) pairs or None on a cache miss
+        """
+        entry = self._avail_cache.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, slots = entry
+        if expires_at <= time.monotonic():
+            del self._avail_cache[key]
+            return None
+        
+        return slots
+    
+    def _cache_available_times(self, key: Tuple[str, str], slots: List[Tuple[datetime.datetime, Dict[str, Any]]]) -> None:
+        """
+        Store available times in the cache, evicting the oldest entry when full
+        
+        Args:
+            key: Tuple of (event_type_id, date_str)
+            slots: List of (start datetime, slot) pairs
+        """
+        if key not in self._avail_cache and len(self._avail_cache) >= CALENDLY_CACHE_MAX_SIZE:
+            del self._avail_cache[next(iter(self._avail_cache))]
+        
+        self._avail_cache[key] = (time.monotonic() + CALENDLY_AVAILABILITY_CACHE_TTL, slots)
+    
+    def invalidate_available_times(self, event_type_id: str, date_str: str) -> None:
+        """
+        Drop cached available times for an event type on a date
+        
+        Args:
+            event_type_id: The Calendly event type ID
+            date_str: Date string in YYYY-MM-DD format
+        """
+        self._avail_cache.pop((event_type_id, date_str), None)
     
     def get_event_types(self) -> List[Dict[str, Any]]:
         """
@@ -28,6 +135,9 @@ class CalendlyAPI:
         Returns:
             List of event types
         """
+        if self._event_types_cache and self._event_types_cache[0] > time.monotonic():
+            return self._event_types_cache[1]
+        
         try:
             url = f"{self.base_url}/event_types"
             params = {
@@ -35,11 +145,13 @@ class CalendlyAPI:
                 "active": True
             }
             
-            response = requests.get(url, headers=self.headers, params=params)
+            response = self.session.get(url, params=params, timeout=CALENDLY_REQUEST_TIMEOUT)
             response.raise_for_status()
             
             data = response.json()
-            return data.get("data", [])
+            event_types = data.get("data", [])
+            self._event_types_cache = (time.monotonic() + CALENDLY_EVENT_TYPES_CACHE_TTL, event_types)
+            return event_types
         
         except requests.exceptions.RequestException as e:
             logger.error(f"Error getting event types: {str(e)}")
@@ -56,7 +168,7 @@ class CalendlyAPI:
             Event type ID
         """
         # Default to general medicine if specialty is not found
-        return SPECIALTY_EVENT_TYPES.get(specialty, SPECIALTY_EVENT_TYPES["General Medicine"])
+        return self._spec_types.get(specialty, self._default_spec)
     
     def get_available_times(self, event_type_id: str, date_str: str) -> List[Dict[str, Any]]:
         """
@@ -69,6 +181,25 @@ class CalendlyAPI:
         Returns:
             List of available time slots
         """
+        return [slot for _, slot in self._get_available_slots(event_type_id, date_str)]
+    
+    def _get_available_slots(self, event_type_id: str, date_str: str) -> List[Tuple[datetime.datetime, Dict[str, Any]]]:
+        """
+        Get available time slots paired with their parsed UTC start times
+        
+        Args:
+            event_type_id: The Calendly event type ID
+            date_str: Date string in YYYY-MM-DD format
+        
+        Returns:
+            List of (start datetime, slot) pairs
+        """
+        # Serve repeated lookups for the same event type and date from the cache
+        cache_key = (event_type_id, date_str)
+        cached = self._get_cached_available_times(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             # Convert the date string to datetime
             date_obj = datetime.datetime.strptime(date_str, "%Y-%m-%d")
@@ -85,11 +216,17 @@ class CalendlyAPI:
                 "end_time": end_time
             }
             
-            response = requests.get(url, headers=self.headers, params=params)
+            response = self.session.get(url, params=params, timeout=CALENDLY_REQUEST_TIMEOUT)
             response.raise_for_status()
             
             data = response.json()
-            return data.get("data", [])
+            # Parse each slot's start time once, when it is fetched
+            available_slots = [
+                (_parse_slot_time(slot['start_time']), slot)
+                for slot in data.get("data", [])
+            ]
+            self._cache_available_times(cache_key, available_slots)
+            return available_slots
         
         except Exception as e:
             logger.error(f"Error getting available times: {str(e)}")
@@ -101,54 +238,46 @@ class CalendlyAPI:
         
         Args:
             specialty: Medical specialty
-            date_str: Date string in YYYY-MM-DD format
+            date_str: Date string in various formats (will be parsed)
             time_str: Time string in various formats (will be parsed)
         
         Returns:
             Tuple of (is_available, alternative_times)
         """
         try:
-            # Parse the time string
-            time_formats = [
-                "%H:%M",         # 13:00
-                "%I:%M %p",      # 1:00 PM
-                "%I %p",         # 1 PM
-                "%I:%M%p",       # 1:00PM
-                "%I%p"           # 1PM
-            ]
+            # Parse the date and time strings
+            parsed_date = parse_date(date_str)
+            
+            if not parsed_date:
+                logger.warning(f"Could not parse date string: {date_str}")
+                return False, []
             
-            parsed_time = None
-            for fmt in time_formats:
-                try:
-                    parsed_time = datetime.datetime.strptime(time_str, fmt).time()
-                    break
-                except ValueError:
-                    continue
+            parsed_time = parse_time(time_str)
             
             if not parsed_time:
                 logger.warning(f"Could not parse time string: {time_str}")
                 return False, []
             
             # Get event type ID for the specialty
-            event_type_id = self.get_specialty_event_type(specialty)
+            event_type_id = self._spec_types.get(specialty, self._default_spec)
             
-            # Get available times for the date
-            available_times = self.get_available_times(event_type_id, date_str)
+            # Get available slots for the date
+            available_slots = self._get_available_slots(event_type_id, parsed_date.isoformat())
             
-            # Convert parsed time to ISO format for comparison
-            parsed_date = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
-            requested_datetime = datetime.datetime.combine(parsed_date, parsed_time)
-            requested_iso = requested_datetime.isoformat() + 'Z'
+            # Requested times are interpreted as UTC, matching the times sent to Calendly
+            requested_datetime = datetime.datetime.combine(
+                parsed_date, parsed_time, tzinfo=datetime.timezone.utc
+            )
             
-            # Check if requested time is available
-            is_available = any(slot['start_time'] == requested_iso for slot in available_times)
+            # Check if requested time is available (compared by value, not by string)
+            start_times = {slot_time for slot_time, _ in available_slots}
+            is_available = requested_datetime in start_times
             
             # Get alternative times if requested time is not available
             alternative_times = []
-            if not is_available and available_times:
-                for slot in available_times[:3]:  # Get up to 3 alternatives
-                    slot_time = datetime.datetime.fromisoformat(slot['start_time'].replace('Z', '+00:00'))
-                    alternative_times.append(slot_time.strftime("%I:%M %p"))
+            if not is_available and available_slots:
+                # Get up to 3 alternatives
+                alternative_times = [slot_time.strftime("%I:%M %p") for slot_time, _ in available_slots[:3]]
             
             return is_available, alternative_times
         
@@ -168,48 +297,20 @@ class CalendlyAPI:
         """
         try:
             # Get event type ID
-            event_type_id = self.get_specialty_event_type(event_data.get('consultation_type', 'General Medicine'))
+            event_type_id = self._spec_types.get(event_data.get('consultation_type'), self._default_spec)
             
             # Format the date and time
             date_str = event_data.get('date')
             time_str = event_data.get('time')
             
             # Parse the date and time
-            date_formats = [
-                "%Y-%m-%d",       # 2025-03-10
-                "%B %d, %Y",      # March 10, 2025
-                "%b %d, %Y",      # Mar 10, 2025
-                "%d/%m/%Y",       # 10/03/2025
-                "%m/%d/%Y",       # 03/10/2025
-            ]
-            
-            parsed_date = None
-            for fmt in date_formats:
-                try:
-                    parsed_date = datetime.datetime.strptime(date_str, fmt).date()
-                    break
-                except (ValueError, TypeError):
-                    continue
+            parsed_date = parse_date(date_str)
             
             if not parsed_date:
                 return {"success": False, "error": f"Could not parse date string: {date_str}"}
             
             # Parse time
-            time_formats = [
-                "%H:%M",         # 13:00
-                "%I:%M %p",      # 1:00 PM
-                "%I %p",         # 1 PM
-                "%I:%M%p",       # 1:00PM
-                "%I%p"           # 1PM
-            ]
-            
-            parsed_time = None
-            for fmt in time_formats:
-                try:
-                    parsed_time = datetime.datetime.strptime(time_str, fmt).time()
-                    break
-                except (ValueError, TypeError):
-                    continue
+            parsed_time = parse_time(time_str)
             
             if not parsed_time:
                 return {"success": False, "error": f"Could not parse time string: {time_str}"}
@@ -240,10 +341,14 @@ class CalendlyAPI:
                 ]
             }
             
-            response = requests.post(url, headers=self.headers, json=payload)
+            response = self.session.post(url, json=payload, timeout=CALENDLY_REQUEST_TIMEOUT)
             response.raise_for_status()
             
             data = response.json()
+            
+            # The booked slot is no longer available
+            self.invalidate_available_times(event_type_id, parsed_date.isoformat())
+            
             return {"success": True, "data": data.get("data", {})}
         
         except requests.exceptions.HTTPError as e:
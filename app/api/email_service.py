@@ -3,17 +3,114 @@ Email service for sending appointment confirmations and reminders
 """
 
 import os
+import re
 import logging
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
 
-from config.settings import EMAIL_TEMPLATES
+from config.settings import EMAIL_TEMPLATES, EMAIL_MAX_WORKERS
+
+# smtplib and email.mime are imported on first send to keep startup fast
+if TYPE_CHECKING:
+    import smtplib
+    from email.mime.multipart import MIMEMultipart
 
 logger = logging.getLogger(__name__)
 
+# Fallback templates used when the template files are not found
+# (already in str.format_map form)
+_FALLBACK_CONFIRMATION_TEMPLATE = """
+<html>
+<body>
+    <h2>Hospital Appointment Confirmation</h2>
+    <p>Dear {name},</p>
+    <p>Your appointment has been confirmed with the following details:</p>
+    <ul>
+        <li><strong>Consultation Type:</strong> {consultation_type}</li>
+        <li><strong>Reason for Visit:</strong> {reason}</li>
+        <li><strong>Date:</strong> {date}</li>
+        <li><strong>Time:</strong> {time}</li>
+        <li><strong>Location:</strong> Hospital Clinic, Medical Center</li>
+    </ul>
+    <p>Please arrive 15 minutes before your scheduled appointment time.</p>
+    <p>If you need to reschedule or cancel your appointment, please contact us at least 24 hours in advance.</p>
+    <p>Thank you,<br>Hospital Clinic Team</p>
+</body>
+</html>
+"""
+
+_FALLBACK_REMINDER_TEMPLATE = """
+<html>
+<body>
+    <h2>Reminder: Your Upcoming Hospital Appointment</h2>
+    <p>Dear {name},</p>
+    <p>This is a friendly reminder about your upcoming appointment:</p>
+    <ul>
+        <li><strong>Consultation Type:</strong> {consultation_type}</li>
+        <li><strong>Date:</strong> {date}</li>
+        <li><strong>Time:</strong> {time}</li>
+        <li><strong>Location:</strong> Hospital Clinic, Medical Center</li>
+    </ul>
+    <p>Please arrive 15 minutes before your scheduled appointment time.</p>
+    <p>If you need to reschedule or cancel your appointment, please contact us as soon as possible.</p>
+    <p>Thank you,<br>Hospital Clinic Team</p>
+</body>
+</html>
+"""
+
+# Matches a "{{key}}" placeholder once all braces have been escaped
+_ESCAPED_PLACEHOLDER_RE = re.compile(r'\{\{\{\{(\w+)\}\}\}\}')
+
+class _SafeDict(dict):
+    """Context mapping that leaves unknown placeholders untouched"""
+    
+    def __missing__(self, key: str) -> str:
+        return f"{{{{{key}}}}}"
+
+def _to_format_template(template: str) -> str:
+    """
+    Convert a "{{key}}" template to a str.format_map template
+    
+    Literal braces (e.g. inline CSS) are escaped so only placeholders are substituted.
+    
+    Args:
+        template: Template string using "{{key}}" placeholders
+    
+    Returns:
+        Template string using "{key}" placeholders
+    """
+    escaped = template.replace('{', '{{').replace('}', '}}')
+    return _ESCAPED_PLACEHOLDER_RE.sub(r'{\1}', escaped)
+
+@functools.lru_cache(maxsize=32)
+def _load_template_cached(template_path: str) -> Optional[str]:
+    """
+    Load an email template from file, caching the converted result per path
+    
+    Call ``_load_template_cached.cache_clear()`` to pick up edited templates.
+    
+    Args:
+        template_path: Path to the template file
+    
+    Returns:
+        Template content or None if loading fails
+    """
+    try:
+        path = Path(template_path)
+        if not path.exists():
+            logger.error(f"Template file not found: {path}")
+            return None
+        
+        with open(path, 'r') as file:
+            return _to_format_template(file.read())
+    
+    except Exception as e:
+        logger.error(f"Error loading email template: {str(e)}")
+        return None
+
 class EmailService:
     """Email service for sending appointment confirmations and reminders"""
     
@@ -24,8 +121,56 @@ class EmailService:
         self.username = os.getenv('EMAIL_USERNAME')
         self.password = os.getenv('EMAIL_PASSWORD')
         self.sender_name = os.getenv('EMAIL_SENDER_NAME', 'Hospital Appointment System')
+        
+        # One authenticated SMTP connection per thread, reused across sends
+        self._local = threading.local()
+    
+    def _get_smtp(self) -> "smtplib.SMTP":
+        """
+        Get an authenticated SMTP connection for the current thread
+        
+        Reuses the existing connection if it is still alive, otherwise
+        connects, starts TLS and logs in again.
+        
+        Returns:
+            SMTP connection
+        """
+        import smtplib
+        
+        smtp = getattr(self._local, 'smtp', None)
+        if smtp is not None:
+            try:
+                if smtp.noop()[0] == 250:
+                    return smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close_smtp()
+        
+        smtp = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        smtp.starttls()
+        smtp.login(self.username, self.password)
+        self._local.smtp = smtp
+        return smtp
+    
+    def _close_smtp(self) -> None:
+        """Close the current thread's SMTP connection, if any"""
+        smtp = getattr(self._local, 'smtp', None)
+        self._local.smtp = None
+        if smtp is None:
+            return
+        
+        import smtplib
+        
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
     
-    def _create_message(self, recipient: str, subject: str, body: str, is_html: bool = True) -> MIMEMultipart:
+    def close(self) -> None:
+        """Close the SMTP connection held by the calling thread"""
+        self._close_smtp()
+    
+    def _create_message(self, recipient: str, subject: str, body: str, is_html: bool = True) -> "MIMEMultipart":
         """
         Create an email message
         
@@ -38,6 +183,9 @@ class EmailService:
         Returns:
             Email message object
         """
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
+        
         msg = MIMEMultipart()
         msg['From'] = f"{self.sender_name} <{self.username}>"
         msg['To'] = recipient
@@ -59,37 +207,21 @@ class EmailService:
         Returns:
             Template content or None if loading fails
         """
-        try:
-            template_path = Path(template_path)
-            if not template_path.exists():
-                logger.error(f"Template file not found: {template_path}")
-                return None
-            
-            with open(template_path, 'r') as file:
-                return file.read()
-        
-        except Exception as e:
-            logger.error(f"Error loading email template: {str(e)}")
-            return None
+        return _load_template_cached(str(template_path))
     
     def _render_template(self, template: str, context: Dict[str, Any]) -> str:
         """
         Render a template with context variables
         
         Args:
-            template: Template string
+            template: Template string with "{key}" placeholders
             context: Dictionary of context variables
         
         Returns:
             Rendered template
         """
-        # Simple template rendering - replace placeholders with values
-        rendered = template
-        for key, value in context.items():
-            placeholder = f"{{{{{key}}}}}"
-            rendered = rendered.replace(placeholder, str(value))
-        
-        return rendered
+        # Single pass over the template; unknown placeholders are left as-is
+        return template.format_map(_SafeDict(context))
     
     def send_email(self, recipient: str, subject: str, body: str, is_html: bool = True) -> bool:
         """
@@ -104,15 +236,18 @@ class EmailService:
         Returns:
             Success status
         """
+        import smtplib
+        
         try:
             # Create the message
             msg = self._create_message(recipient, subject, body, is_html)
             
-            # Connect to the SMTP server and send the email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.username, self.password)
-                server.send_message(msg)
+            # Send over the pooled connection, reconnecting once if the server dropped it
+            try:
+                self._get_smtp().send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                self._close_smtp()
+                self._get_smtp().send_message(msg)
             
             logger.info(f"Email sent successfully to {recipient}")
             return True
@@ -150,25 +285,7 @@ class EmailService:
             
             if not template:
                 # Fallback to a basic template if the template file is not found
-                template = """
-                <html>
-                <body>
-                    <h2>Hospital Appointment Confirmation</h2>
-                    <p>Dear {{name}},</p>
-                    <p>Your appointment has been confirmed with the following details:</p>
-                    <ul>
-                        <li><strong>Consultation Type:</strong> {{consultation_type}}</li>
-                        <li><strong>Reason for Visit:</strong> {{reason}}</li>
-                        <li><strong>Date:</strong> {{date}}</li>
-                        <li><strong>Time:</strong> {{time}}</li>
-                        <li><strong>Location:</strong> Hospital Clinic, Medical Center</li>
-                    </ul>
-                    <p>Please arrive 15 minutes before your scheduled appointment time.</p>
-                    <p>If you need to reschedule or cancel your appointment, please contact us at least 24 hours in advance.</p>
-                    <p>Thank you,<br>Hospital Clinic Team</p>
-                </body>
-                </html>
-                """
+                template = _FALLBACK_CONFIRMATION_TEMPLATE
             
             # Render the template
             rendered_body = self._render_template(template, appointment_data)
@@ -181,12 +298,38 @@ class EmailService:
             logger.error(f"Error sending confirmation email: {str(e)}")
             return False
     
-    def send_reminder_email(self, appointment_data: Dict[str, Any]) -> bool:
+    def _get_reminder_template(self) -> Optional[Tuple[str, str]]:
         """
-        Send a reminder email for an upcoming appointment
+        Get the reminder email template and subject
+        
+        Returns:
+            Tuple of (template, subject) or None if the configuration is missing
+        """
+        # Get the template configuration
+        template_config = EMAIL_TEMPLATES.get('reminder')
+        if not template_config:
+            logger.error("Reminder email template configuration not found")
+            return None
+        
+        # Load the template
+        template_path = template_config.get('template_path')
+        template = self._load_template(template_path)
+        
+        if not template:
+            # Fallback to a basic template if the template file is not found
+            template = _FALLBACK_REMINDER_TEMPLATE
+        
+        subject = template_config.get('subject', 'Reminder: Your Upcoming Hospital Appointment')
+        return template, subject
+    
+    def _send_one_reminder(self, appointment_data: Dict[str, Any], template: str, subject: str) -> bool:
+        """
+        Render and send a single reminder email
         
         Args:
             appointment_data: Dictionary with appointment details
+            template: Reminder template
+            subject: Email subject
         
         Returns:
             Success status
@@ -198,44 +341,67 @@ class EmailService:
                 logger.error("No recipient email provided for reminder email")
                 return False
             
-            # Get the template configuration
-            template_config = EMAIL_TEMPLATES.get('reminder')
-            if not template_config:
-                logger.error("Reminder email template configuration not found")
-                return False
-            
-            # Load the template
-            template_path = template_config.get('template_path')
-            template = self._load_template(template_path)
-            
-            if not template:
-                # Fallback to a basic template if the template file is not found
-                template = """
-                <html>
-                <body>
-                    <h2>Reminder: Your Upcoming Hospital Appointment</h2>
-                    <p>Dear {{name}},</p>
-                    <p>This is a friendly reminder about your upcoming appointment:</p>
-                    <ul>
-                        <li><strong>Consultation Type:</strong> {{consultation_type}}</li>
-                        <li><strong>Date:</strong> {{date}}</li>
-                        <li><strong>Time:</strong> {{time}}</li>
-                        <li><strong>Location:</strong> Hospital Clinic, Medical Center</li>
-                    </ul>
-                    <p>Please arrive 15 minutes before your scheduled appointment time.</p>
-                    <p>If you need to reschedule or cancel your appointment, please contact us as soon as possible.</p>
-                    <p>Thank you,<br>Hospital Clinic Team</p>
-                </body>
-                </html>
-                """
-            
-            # Render the template
+            # Render the template and send the email
             rendered_body = self._render_template(template, appointment_data)
-            
-            # Send the email
-            subject = template_config.get('subject', 'Reminder: Your Upcoming Hospital Appointment')
             return self.send_email(recipient, subject, rendered_body, is_html=True)
         
         except Exception as e:
             logger.error(f"Error sending reminder email: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+    
+    def send_reminder_email(self, appointment_data: Dict[str, Any]) -> bool:
+        """
+        Send a reminder email for an upcoming appointment
+        
+        Args:
+            appointment_data: Dictionary with appointment details
+        
+        Returns:
+            Success status
+        """
+        try:
+            reminder = self._get_reminder_template()
+            if not reminder:
+                return False
+            
+            return self._send_one_reminder(appointment_data, *reminder)
+        
+        except Exception as e:
+            logger.error(f"Error sending reminder email: {str(e)}")
+            return False
+    
+    def send_reminder_emails(self, appointments: List[Dict[str, Any]]) -> List[bool]:
+        """
+        Send reminder emails for a batch of appointments
+        
+        The template is loaded once and the sends are spread over up to
+        EMAIL_MAX_WORKERS threads, each reusing its own SMTP connection.
+        
+        Args:
+            appointments: List of dictionaries with appointment details
+        
+        Returns:
+            Success status for each appointment, in the same order
+        """
+        results = [False] * len(appointments)
+        if not appointments:
+            return results
+        
+        reminder = self._get_reminder_template()
+        if not reminder:
+            return results
+        
+        workers = min(EMAIL_MAX_WORKERS, len(appointments))
+        
+        def send_batch(offset: int) -> None:
+            # Each worker sends every n-th reminder over one connection
+            try:
+                for index in range(offset, len(appointments), workers):
+                    results[index] = self._send_one_reminder(appointments[index], *reminder)
+            finally:
+                self._close_smtp()
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reminder") as pool:
+            list(pool.map(send_batch, range(workers)))
+        
+        return results
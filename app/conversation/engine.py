@@ -3,11 +3,17 @@ Conversation engine for managing the appointment scheduling flow
 """
 
 import os
+import asyncio
 import logging
+import re
+import sys
 import datetime
+import functools
+import hashlib
 import json
+import threading
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, TextIO, Tuple
 
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
@@ -18,13 +24,118 @@ from langchain_core.prompts import ChatPromptTemplate
 from app.agent.prompts import get_system_prompt
 from app.agent.tools import create_scheduling_tool
 from app.conversation.processor import ConversationProcessor
+from app.conversation.response_cache import ResponseCache
 from app.api.calendly import CalendlyAPI
 from app.api.email_service import EmailService
 from app.models.appointment import Appointment
+from app.models.conversation import TurnOutput
 from app.utils.logger import get_logger
+from config.settings import RESPONSE_CACHE_SIMILARITY, RESPONSE_CACHE_MAX_TURNS, RESPONSE_CACHE_FILE
+
+try:
+    import orjson
+except ImportError:  # Optional dependency: fall back to the standard json module
+    orjson = None
 
 logger = get_logger(__name__)
 
+# ReAct prompt for the scheduling agent
+_AGENT_TEMPLATE = """
+        You are an assistant tasked with scheduling hospital appointments.
+        Use the following tools to schedule an appointment based on the information provided:
+
+        {tools}
+
+        Use the following format:
+        Question: the input question you must answer
+        Thought: you should always think about what to do
+        Action: the action to take, should be one of [{tool_names}]
+        Action Input: the input to the action
+        Observation: the result of the action
+        ... (this Thought/Action/Action Input/Observation can repeat N times)
+        Thought: I now know the final answer
+        Final Answer: the final answer to the original input question
+
+        Begin!
+
+        Question: {input}
+        {agent_scratchpad}
+        """
+
+@functools.lru_cache(maxsize=1)
+def _compile_agent_prompt() -> ChatPromptTemplate:
+    """
+    Parse the agent prompt template once per process
+    
+    Returns:
+        Agent prompt template
+    """
+    return ChatPromptTemplate.from_template(_AGENT_TEMPLATE)
+
+# Patterns like "confirmation number: ABC123" or similar, in priority order
+_EVENT_ID_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r'confirmation number[:\s]+([A-Za-z0-9\-_]+)',
+        r'confirmation[:\s]+([A-Za-z0-9\-_]+)',
+        r'appointment ID[:\s]+([A-Za-z0-9\-_]+)',
+        r'ID[:\s]+([A-Za-z0-9\-_]+)'
+    )
+)
+
+# Maps every non-alphanumeric ASCII character to "_" for appointment filenames
+_SAFE_NAME_TABLE = str.maketrans({c: '_' for c in map(chr, range(128)) if not c.isalnum()})
+
+@functools.lru_cache(maxsize=None)
+def _shared_response_cache(path: str) -> ResponseCache:
+    """
+    Get the response cache persisted at a path, shared by all engines in the process
+    
+    Args:
+        path: JSON Lines file of the cache
+    
+    Returns:
+        Response cache
+    """
+    return ResponseCache(path=path, threshold=RESPONSE_CACHE_SIMILARITY)
+
+async def _ainput(prompt: str) -> str:
+    """
+    Read a line from the terminal without blocking the event loop
+    
+    Uses a daemon thread rather than the default executor, which asyncio.run
+    would wait on at shutdown (e.g. after Ctrl+C) until the user presses Enter.
+    
+    Args:
+        prompt: Prompt to display
+    
+    Returns:
+        Line entered by the user
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def deliver(callback, value):
+        if not future.done():
+            callback(value)
+    
+    def read():
+        try:
+            line = input(prompt)
+        except BaseException as e:
+            result = (future.set_exception, e)
+        else:
+            result = (future.set_result, line)
+        
+        try:
+            loop.call_soon_threadsafe(deliver, *result)
+        except RuntimeError:
+            # The event loop has already been closed
+            pass
+    
+    threading.Thread(target=read, name="input", daemon=True).start()
+    return await future
+
 class ConversationEngine:
     """Engine for managing the conversation flow for appointment scheduling"""
     
@@ -35,14 +146,29 @@ class ConversationEngine:
             temperature=float(os.getenv('TEMPERATURE', 0.7))
         )
         
+        # Same model, returning the reply and the collected fields in one call.
+        # Function calling streams partial TurnOutputs; json_schema only parses
+        # the fully assembled message.
+        self.structured_llm = self.llm.with_structured_output(TurnOutput, method="function_calling")
+        
         self.calendly_api = CalendlyAPI()
         self.email_service = EmailService()
         self.processor = ConversationProcessor()
+        self.response_cache = _shared_response_cache(
+            os.path.join(os.getenv('DATA_DIR', 'data'), RESPONSE_CACHE_FILE)
+        )
         
         # Initialize the conversation history
         self.messages = [SystemMessage(content=get_system_prompt())]
         self.conversation_history = []
         
+        # Append-only conversation log, written one line per message
+        self._log_fp = self._open_conversation_log()
+        
+        # Appointment data extracted so far and how much of the history it covers
+        self._appointment_data: Dict[str, str] = {}
+        self._scanned_idx: int = 0
+        
         # Initialize the agent executor
         self._setup_agent()
     
@@ -54,31 +180,8 @@ class ConversationEngine:
             email_service=self.email_service
         )
         
-        # Agent template
-        agent_template = """
-        You are an assistant tasked with scheduling hospital appointments.
-        Use the following tools to schedule an appointment based on the information provided:
-
-        {tools}
-
-        Use the following format:
-        Question: the input question you must answer
-        Thought: you should always think about what to do
-        Action: the action to take, should be one of [{tool_names}]
-        Action Input: the input to the action
-        Observation: the result of the action
-        ... (this Thought/Action/Action Input/Observation can repeat N times)
-        Thought: I now know the final answer
-        Final Answer: the final answer to the original input question
-
-        Begin!
-
-        Question: {input}
-        {agent_scratchpad}
-        """
-        
         # Create agent prompt
-        agent_prompt = ChatPromptTemplate.from_template(agent_template)
+        agent_prompt = _compile_agent_prompt()
         
         # Create agent
         agent = create_react_agent(self.llm, [scheduling_tool], agent_prompt)
@@ -92,13 +195,26 @@ class ConversationEngine:
     
     def start(self):
         """Start the conversation loop"""
+        try:
+            asyncio.run(self.astart())
+        finally:
+            self.close()
+    
+    def close(self) -> None:
+        """Close the conversation log"""
+        if self._log_fp is not None:
+            self._log_fp.close()
+            self._log_fp = None
+    
+    async def astart(self):
+        """Run the conversation loop on an asyncio event loop"""
         print("Hospital Clinic Appointment System (Type 'bye' to exit)")
         print("--------------------------------------------------------")
         
         while True:
             # Get user input
-            user_input = input("Human: ")
-            self.conversation_history.append(f"User: {user_input}")
+            user_input = await _ainput("Human: ")
+            self._append_history(f"User: {user_input}")
             
             # Check for exit command
             if user_input.lower() in ['bye', 'exit', 'quit']:
@@ -108,16 +224,23 @@ class ConversationEngine:
             # Add user message to conversation history
             self.messages.append(HumanMessage(content=user_input))
             
-            # Process the conversation and get response
-            response = self._process_conversation(user_input)
+            # Process the conversation, streaming the response as it is generated
+            sys.stdout.write("Assistant: ")
+            sys.stdout.flush()
+            response, appointment_data = await self._process_conversation(user_input)
+            print()
+            self._append_history(f"Bot: {response}")
             
-            # Print the response
-            print(f"Assistant: {response}")
-            self.conversation_history.append(f"Bot: {response}")
+            # Fall back to regex extraction over the new messages if the model did not return the fields
+            if appointment_data is None:
+                appointment_data = self.processor.extract_fields_from(
+                    self.conversation_history[self._scanned_idx:], self._appointment_data
+                )
             
-            # Check if we have all the required information to schedule the appointment
-            appointment_data = self.processor.extract_appointment_data(self.conversation_history)
+            self._appointment_data = appointment_data
+            self._scanned_idx = len(self.conversation_history)
             
+            # Check if we have all the required information to schedule the appointment
             if self._is_appointment_data_complete(appointment_data):
                 # Format the appointment data for the agent
                 appointment_info = self._format_appointment_info(appointment_data)
@@ -126,17 +249,21 @@ class ConversationEngine:
                 
                 # Use agent executor to schedule the appointment
                 try:
-                    result = self.agent_executor.invoke({
+                    result = await self.agent_executor.ainvoke({
                         "input": f"Schedule this hospital appointment: {appointment_info}"
                     })
                     
                     agent_response = result['output']
                     print(f"Assistant: {agent_response}")
-                    self.conversation_history.append(f"Bot: {agent_response}")
+                    self._append_history(f"Bot: {agent_response}")
                     
                     # Check if the appointment was scheduled successfully
                     if "not available" in agent_response.lower():
-                        # Time not available, continue the conversation
+                        # Time not available, forget the rejected slot and continue the conversation
+                        self._appointment_data = {
+                            field: value for field, value in self._appointment_data.items()
+                            if field not in ('date', 'time')
+                        }
                         self.messages.append(HumanMessage(
                             content="I see that time is not available. Let me choose a different time."
                         ))
@@ -152,32 +279,132 @@ class ConversationEngine:
                     error_msg = f"Error scheduling appointment: {str(e)}"
                     logger.error(error_msg)
                     print(f"Assistant: {error_msg}")
-                    self.conversation_history.append(f"Bot: {error_msg}")
+                    self._append_history(f"Bot: {error_msg}")
                     # Continue the conversation
     
-    def _process_conversation(self, user_input: str) -> str:
+    async def _process_conversation(self, user_input: str) -> Tuple[str, Optional[Dict[str, str]]]:
         """
-        Process a user message and generate a response
+        Process a user message and stream the response to stdout
+        
+        The reply and the appointment details collected so far come back from a
+        single structured LLM call. If that fails, a plain reply is generated and
+        the fields are left for the regex processor to extract.
         
         Args:
             user_input: User's message
         
+        Returns:
+            Tuple of (assistant's response, appointment data or None)
+        """
+        # Serve near-duplicate early turns from the response cache; lookups may
+        # load or run the embedding model, so they run off the event loop
+        cache_key = self._response_cache_key()
+        if cache_key is not None:
+            cached = await asyncio.to_thread(self.response_cache.get, user_input, cache_key)
+            if cached is not None:
+                reply, appointment_data = cached
+                self._echo("", reply)
+                self.messages.append(AIMessage(content=reply))
+                return reply, dict(appointment_data)
+        
+        printed = ""
+        try:
+            # Partial outputs carry the reply generated so far
+            turn = None
+            async for partial in self.structured_llm.astream(self.messages):
+                if partial is not None:
+                    turn = partial
+                    printed = self._echo(printed, turn.reply)
+            
+            if turn is not None:
+                if printed != turn.reply:
+                    self._echo("", f"\n{turn.reply}")
+                self.messages.append(AIMessage(content=turn.reply))
+                appointment_data = turn.fields.to_dict()
+                
+                # Only turns that collected no new details may be reused for similar messages
+                if cache_key is not None and appointment_data == self._appointment_data:
+                    self.response_cache.put(user_input, cache_key, turn.reply, appointment_data)
+                
+                return turn.reply, appointment_data
+        
+        except Exception as e:
+            logger.warning(f"Structured response failed, falling back to plain reply: {str(e)}")
+        
+        if printed:
+            self._echo("", "\n")
+        
+        return await self._generate_reply(), None
+    
+    @staticmethod
+    def _echo(printed: str, reply: str) -> str:
+        """
+        Write the part of a streamed reply that has not been printed yet
+        
+        Args:
+            printed: Text already written to stdout
+            reply: Reply generated so far
+        
+        Returns:
+            Text written to stdout after this call
+        """
+        if not reply.startswith(printed):
+            return printed
+        
+        sys.stdout.write(reply[len(printed):])
+        sys.stdout.flush()
+        return reply
+    
+    def _response_cache_key(self) -> Optional[str]:
+        """
+        Build the response cache key for the current conversation state
+        
+        The key is the system prompt, the assistant's previous reply and the
+        collected appointment data, so "yes" is only answered from the cache
+        when it follows the same question. The key does not depend on the
+        session, so early turns (greetings, questions about the clinic) can be
+        reused across sessions on the same day. Only the first few turns are
+        cached, since later replies depend on more of the conversation than that.
+        
+        Returns:
+            Cache key or None if the current turn should not be cached
+        """
+        user_turns = sum(1 for message in self.messages if isinstance(message, HumanMessage))
+        if user_turns > RESPONSE_CACHE_MAX_TURNS:
+            return None
+        
+        previous_reply = next(
+            (message.content for message in reversed(self.messages) if isinstance(message, AIMessage)),
+            ""
+        )
+        # The system prompt includes today's date, so cached replies expire daily
+        prompt_digest = hashlib.sha1(self.messages[0].content.encode('utf-8')).hexdigest()
+        return json.dumps([prompt_digest, previous_reply, sorted(self._appointment_data.items())])
+    
+    async def _generate_reply(self) -> str:
+        """
+        Generate a plain assistant reply for the current conversation, streaming it to stdout
+        
         Returns:
             Assistant's response
         """
+        printed = ""
         try:
             # Generate a response using the LLM
-            response = self.llm.invoke(self.messages)
+            async for chunk in self.llm.astream(self.messages):
+                printed = self._echo(printed, printed + chunk.content)
             
             # Add the assistant's response to conversation history
-            self.messages.append(response)
+            self.messages.append(AIMessage(content=printed))
             
-            return response.content
+            return printed
         
         except Exception as e:
             error_msg = f"Error generating response: {str(e)}"
             logger.error(error_msg)
-            return "I'm sorry, I encountered an error while processing your request. Please try again."
+            reply = "I'm sorry, I encountered an error while processing your request. Please try again."
+            self._echo("", f"\n{reply}" if printed else reply)
+            return reply
     
     def _is_appointment_data_complete(self, appointment_data: Dict[str, str]) -> bool:
         """
@@ -221,6 +448,8 @@ class ConversationEngine:
             agent_response: Response from the agent
         """
         try:
+            now = datetime.datetime.now()
+            
             # Create an Appointment object
             appointment = Appointment(
                 patient_name=appointment_data.get('name', ''),
@@ -231,7 +460,8 @@ class ConversationEngine:
                 phone=appointment_data.get('phone', ''),
                 email=appointment_data.get('email', ''),
                 status="Confirmed" if "confirmed" in agent_response.lower() else "Pending",
-                calendly_event_id=self._extract_event_id(agent_response)
+                calendly_event_id=self._extract_event_id(agent_response),
+                created_at=now.isoformat()
             )
             
             # Save to a file
@@ -242,18 +472,23 @@ class ConversationEngine:
             os.makedirs(appointments_dir, exist_ok=True)
             
             # Generate a filename based on patient name and date
-            safe_name = "".join(c if c.isalnum() else "_" for c in appointment_data.get('name', 'unknown'))
-            filename = f"{safe_name}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            name = appointment_data.get('name', 'unknown')
+            if name.isascii():
+                safe_name = name.translate(_SAFE_NAME_TABLE)
+            else:
+                safe_name = "".join(c if c.isalnum() else "_" for c in name)
+            filename = f"{safe_name}_{now.strftime('%Y%m%d_%H%M%S')}.json"
             file_path = os.path.join(appointments_dir, filename)
             
             # Save the appointment to the file
-            with open(file_path, 'w') as f:
-                json.dump(appointment.to_dict(), f, indent=2)
+            if orjson is not None:
+                with open(file_path, 'wb') as f:
+                    f.write(orjson.dumps(appointment.to_dict(), option=orjson.OPT_INDENT_2))
+            else:
+                with open(file_path, 'w') as f:
+                    json.dump(appointment.to_dict(), f, indent=2)
             
             logger.info(f"Appointment saved to {file_path}")
-            
-            # Save conversation history
-            self._save_conversation()
         
         except Exception as e:
             logger.error(f"Error saving appointment: {str(e)}")
@@ -268,24 +503,20 @@ class ConversationEngine:
         Returns:
             Event ID or None if not found
         """
-        import re
-        # Look for patterns like "confirmation number: ABC123" or similar
-        patterns = [
-            r'confirmation number[:\s]+([A-Za-z0-9\-_]+)',
-            r'confirmation[:\s]+([A-Za-z0-9\-_]+)',
-            r'appointment ID[:\s]+([A-Za-z0-9\-_]+)',
-            r'ID[:\s]+([A-Za-z0-9\-_]+)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _EVENT_ID_PATTERNS:
+            match = pattern.search(text)
             if match:
                 return match.group(1)
         
         return None
     
-    def _save_conversation(self) -> None:
-        """Save the conversation history to a file"""
+    def _open_conversation_log(self) -> Optional[TextIO]:
+        """
+        Open the append-only conversation log for this session
+        
+        Returns:
+            Line-buffered log file or None if it could not be opened
+        """
         try:
             # Save to logs directory
             logs_dir = os.path.join(os.getenv('BASE_DIR', '.'), 'logs')
@@ -294,10 +525,25 @@ class ConversationEngine:
             filename = f"conversation_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
             file_path = os.path.join(logs_dir, filename)
             
-            with open(file_path, 'w') as f:
-                f.write('\n'.join(self.conversation_history))
-            
-            logger.info(f"Conversation saved to {file_path}")
+            log_fp = open(file_path, 'a', buffering=1, encoding='utf-8')
+            logger.info(f"Logging conversation to {file_path}")
+            return log_fp
         
         except Exception as e:
-            logger.error(f"Error saving conversation: {str(e)}")
\ No newline at end of file
+            logger.error(f"Error opening conversation log: {str(e)}")
+            return None
+    
+    def _append_history(self, line: str) -> None:
+        """
+        Add a line to the conversation history and the conversation log
+        
+        Args:
+            line: Conversation line, e.g. "User: ..." or "Bot: ..."
+        """
+        self.conversation_history.append(line)
+        
+        if self._log_fp is not None:
+            try:
+                self._log_fp.write(line + '\n')
+            except Exception as e:
+                logger.error(f"Error writing conversation log: {str(e)}")
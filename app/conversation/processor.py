@@ -4,19 +4,68 @@ Processor for extracting information from conversation history
 
 import re
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set
 
 from app.utils.logger import get_logger
 
+try:
+    import hyperscan
+except ImportError:  # Optional dependency: fall back to scanning with re alone
+    hyperscan = None
+
 logger = get_logger(__name__)
 
+# Formatted appointment summary, as displayed by the assistant.
+# Each value is matched with a linear [^\n]* scan (no lazy backtracking)
+_APPOINTMENT_INFO_RE = re.compile(
+    r'Patient Name:[^\S\n]*([^\n]*)\s*\n'
+    r'Consultation Type:[^\S\n]*([^\n]*)\s*\n'
+    r'Reason for Visit:[^\S\n]*([^\n]*)\s*\n'
+    r'Preferred Date:[^\S\n]*([^\n]*)\s*\n'
+    r'Preferred Time:[^\S\n]*([^\n]*)\s*\n'
+    r'Phone Number:[^\S\n]*([^\n]*)\s*\n'
+    r'Email Address:[^\S\n]*([^\n]*)'
+)
+
+# Phrases indicating a time availability response
+_TIME_AVAILABILITY_RE = re.compile(
+    r'not available'
+    r'|no availability'
+    r'|next available slots'
+    r'|alternative times?'
+    r'|choose (?:a|another) time',
+    re.IGNORECASE
+)
+
+# Time slots like "10:00 AM" in an availability response
+_ALTERNATIVE_TIME_RE = re.compile(r'(\d{1,2}:\d{2}\s*(?:AM|PM|am|pm))')
+
+# Valid consultation specialties
+_SPECIALTIES = (
+    'General Medicine', 'Cardiology', 'Orthopedics',
+    'Pediatrics', 'Neurology', 'Dermatology', 'Ophthalmology'
+)
+
+# Digits and "@" occur in dates, times, phone numbers and email addresses
+_DIGIT_OR_AT_RE = re.compile(r'[\d@]')
+
+# Lowercase literals at least one of which occurs in any text a field pattern
+# can match, besides digits and "@". Keep in sync with the field patterns.
+_FIELD_KEYWORDS = (
+    'name', 'call me', 'consultation', 'specialty', 'need', 'want', 'would like', 'require', 'see ',
+    'general medicine', 'cardiology', 'orthopedics', 'pediatrics', 'neurology', 'dermatology', 'ophthalmology',
+    'reason', 'visit', 'i have', 'having', 'suffering',
+    'date', 'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday', 'today', 'tomorrow',
+    'time', 'phone', 'reached at', 'number is', 'email'
+)
+
 class ConversationProcessor:
     """Processor for extracting appointment information from conversations"""
     
     def __init__(self):
         """Initialize the conversation processor"""
-        # Patterns for extracting appointment data
-        self.patterns = {
+        # Patterns for extracting appointment data, in priority order per field
+        patterns = {
             'name': [
                 r'\bPatient Name:\s*(.*)',
                 r'\bname is\s+([^.,]+)',
@@ -71,6 +120,81 @@ class ConversationProcessor:
                 r'\b([a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+)'
             ]
         }
+        
+        # Compile once per processor rather than on every extraction.
+        # Patterns are kept separate (not fused) because the first pattern
+        # that matches takes priority over later ones.
+        self.patterns = {
+            field: [re.compile(pattern, re.IGNORECASE) for pattern in field_patterns]
+            for field, field_patterns in patterns.items()
+        }
+        
+        # Flat (field, pattern, bound findall) triples in priority order, for the extraction loop
+        self._pattern_pairs = tuple(
+            (field, pattern, pattern.findall)
+            for field, field_patterns in self.patterns.items()
+            for pattern in field_patterns
+        )
+        
+        # Optional Hyperscan prefilter over all field patterns
+        self._flat_patterns = [pattern for _, pattern, _ in self._pattern_pairs]
+        self._hs_db = self._build_prefilter()
+    
+    def _build_prefilter(self) -> Optional[Any]:
+        """
+        Compile all field patterns into a single Hyperscan database
+        
+        Hyperscan has no capture groups, so it is only used to find which
+        patterns match at all; values are still extracted with re.
+        Hyperscan's \\b and character classes are ASCII-only, so the database
+        is only used for ASCII text, where both engines agree.
+        
+        Returns:
+            Hyperscan database, or None if Hyperscan is unavailable
+        """
+        if hyperscan is None:
+            return None
+        
+        try:
+            flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH
+            db = hyperscan.Database()
+            db.compile(
+                expressions=[pattern.pattern.encode('ascii') for pattern in self._flat_patterns],
+                ids=list(range(len(self._flat_patterns))),
+                elements=len(self._flat_patterns),
+                flags=[flags] * len(self._flat_patterns)
+            )
+            return db
+        
+        except Exception as e:
+            logger.warning(f"Hyperscan prefilter unavailable, using re only: {str(e)}")
+            return None
+    
+    def _matching_patterns(self, text: str) -> Optional[Set[Any]]:
+        """
+        Find the field patterns that match anywhere in the text in one pass
+        
+        Args:
+            text: Text to scan
+        
+        Returns:
+            Set of matching compiled patterns, or None if the prefilter cannot be used
+        """
+        if self._hs_db is None or not text.isascii():
+            return None
+        
+        matched = set()
+        
+        def on_match(pattern_id, start, end, flags, context):
+            matched.add(self._flat_patterns[pattern_id])
+        
+        try:
+            self._hs_db.scan(text.encode('ascii'), match_event_handler=on_match)
+        except Exception as e:
+            logger.warning(f"Hyperscan scan failed, using re only: {str(e)}")
+            return None
+        
+        return matched
     
     def extract_appointment_data(self, conversation: List[str]) -> Dict[str, str]:
         """
@@ -82,60 +206,130 @@ class ConversationProcessor:
         Returns:
             Dictionary with extracted appointment data
         """
-        appointment_data = {}
-        
         # Check for formatted appointment data first
-        appointment_info_pattern = re.compile(
-            r'Patient Name:\s*(.*?)\s*\n'
-            r'Consultation Type:\s*(.*?)\s*\n'
-            r'Reason for Visit:\s*(.*?)\s*\n'
-            r'Preferred Date:\s*(.*?)\s*\n'
-            r'Preferred Time:\s*(.*?)\s*\n'
-            r'Phone Number:\s*(.*?)\s*\n'
-            r'Email Address:\s*(.*?)(?:\s*\n|$)',
-            re.DOTALL
-        )
-        
         for message in conversation:
-            match = appointment_info_pattern.search(message)
-            if match:
-                appointment_data['name'] = match.group(1).strip()
-                appointment_data['consultation_type'] = match.group(2).strip()
-                appointment_data['reason'] = match.group(3).strip()
-                appointment_data['date'] = match.group(4).strip()
-                appointment_data['time'] = match.group(5).strip()
-                appointment_data['phone'] = match.group(6).strip()
-                appointment_data['email'] = match.group(7).strip()
+            appointment_data = self._extract_formatted_info(message)
+            if appointment_data:
                 return appointment_data
         
         # If formatted info not found, extract piece by piece
-        full_text = ' '.join(conversation)
-        
-        for field, patterns in self.patterns.items():
-            for pattern in patterns:
-                matches = re.findall(pattern, full_text, re.IGNORECASE)
-                if matches:
-                    # Use the last match (most recent)
-                    extracted_value = matches[-1].strip()
-                    
-                    # Special handling for consultation type
-                    if field == 'consultation_type':
-                        # Map to one of the valid specialties
-                        specialties = [
-                            'General Medicine', 'Cardiology', 'Orthopedics',
-                            'Pediatrics', 'Neurology', 'Dermatology', 'Ophthalmology'
-                        ]
-                        
-                        for specialty in specialties:
-                            if specialty.lower() in extracted_value.lower():
-                                extracted_value = specialty
-                                break
-                    
-                    appointment_data[field] = extracted_value
-                    break
+        return self._extract_fields(' '.join(conversation))
+    
+    def extract_fields_from(self, messages: List[str], appointment_data: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """
+        Extract appointment data from new messages and merge it into earlier data
+        
+        Only the given messages are scanned, so callers can pass just the
+        messages added since the last call. Values from later "User:" messages
+        win, so the user can correct a detail. Other messages only fill fields
+        that are missing or empty, so a low-priority match in a bot reply (e.g.
+        a specialty the bot lists) or a blank summary line cannot replace a
+        value that was already collected.
+        
+        Args:
+            messages: New conversation messages
+            appointment_data: Previously extracted appointment data (default: None)
+        
+        Returns:
+            Dictionary with the merged appointment data
+        """
+        merged = dict(appointment_data or {})
+        
+        for message in messages:
+            fields = self._extract_formatted_info(message) or self._extract_fields(message)
+            from_user = message.startswith("User:")
+            for field, value in fields.items():
+                if value and (from_user or not merged.get(field)):
+                    merged[field] = value
+        
+        return merged
+    
+    def _extract_formatted_info(self, message: str) -> Optional[Dict[str, str]]:
+        """
+        Extract appointment data from a formatted appointment summary
+        
+        Args:
+            message: Conversation message
+        
+        Returns:
+            Dictionary with appointment data or None if the message has no summary
+        """
+        match = _APPOINTMENT_INFO_RE.search(message)
+        if not match:
+            return None
+        
+        return {
+            'name': match.group(1).strip(),
+            'consultation_type': match.group(2).strip(),
+            'reason': match.group(3).strip(),
+            'date': match.group(4).strip(),
+            'time': match.group(5).strip(),
+            'phone': match.group(6).strip(),
+            'email': match.group(7).strip()
+        }
+    
+    def _extract_fields(self, text: str) -> Dict[str, str]:
+        """
+        Extract appointment data piece by piece using the field patterns
+        
+        Args:
+            text: Text to scan
+        
+        Returns:
+            Dictionary with extracted appointment data
+        """
+        appointment_data = {}
+        if not self._may_contain_fields(text):
+            return appointment_data
+        
+        candidates = self._matching_patterns(text)
+        
+        for field, pattern, findall in self._pattern_pairs:
+            # The first matching pattern for a field wins
+            if field in appointment_data:
+                continue
+            
+            if candidates is not None and pattern not in candidates:
+                continue
+            
+            matches = findall(text)
+            if matches:
+                # Use the last match (most recent)
+                extracted_value = matches[-1].strip()
+                
+                # Special handling for consultation type
+                if field == 'consultation_type':
+                    # Map to one of the valid specialties
+                    lowered = extracted_value.lower()
+                    for specialty in _SPECIALTIES:
+                        if specialty.lower() in lowered:
+                            extracted_value = specialty
+                            break
+                
+                appointment_data[field] = extracted_value
         
         return appointment_data
     
+    @staticmethod
+    def _may_contain_fields(text: str) -> bool:
+        """
+        Cheaply check whether any field pattern could match the text
+        
+        Short replies like "hi", "ok" or "thanks" fail this check, so the
+        field patterns are not run on them at all.
+        
+        Args:
+            text: Text to scan
+        
+        Returns:
+            False if no field pattern can match, True otherwise
+        """
+        if _DIGIT_OR_AT_RE.search(text):
+            return True
+        
+        lowered = text.lower()
+        return any(keyword in lowered for keyword in _FIELD_KEYWORDS)
+    
     def extract_information(self, conversation: List[str], pattern: str) -> Optional[str]:
         """
         Extract information from conversation using a pattern
@@ -163,19 +357,7 @@ class ConversationProcessor:
         Returns:
             True if the message is about time availability, False otherwise
         """
-        patterns = [
-            r'not available',
-            r'no availability',
-            r'next available slots',
-            r'alternative times?',
-            r'choose (?:a|another) time'
-        ]
-        
-        for pattern in patterns:
-            if re.search(pattern, message, re.IGNORECASE):
-                return True
-        
-        return False
+        return _TIME_AVAILABILITY_RE.search(message) is not None
     
     def extract_alternative_times(self, message: str) -> List[str]:
         """
@@ -188,9 +370,7 @@ class ConversationProcessor:
             List of time slot strings
         """
         # Look for patterns like "available slots: 10:00 AM, 11:30 AM, 2:00 PM"
-        time_pattern = r'(\d{1,2}:\d{2}\s*(?:AM|PM|am|pm))'
-        
-        matches = re.findall(time_pattern, message)
+        matches = _ALTERNATIVE_TIME_RE.findall(message)
         if matches:
             return [time.strip() for time in matches]
         
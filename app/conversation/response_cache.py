@@ -0,0 +1,210 @@
+"""
+Response cache for repeated user turns
+"""
+
+import os
+import re
+import json
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.utils.logger import get_logger
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # Optional dependency: fall back to exact matching on normalized text
+    SentenceTransformer = None
+
+logger = get_logger(__name__)
+
+# Characters ignored when comparing user messages
+_NON_WORD_RE = re.compile(r'[^\w\s]+')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+class ResponseCache:
+    """
+    Cache of assistant turns keyed by the user message and the conversation state
+    
+    A cached turn is only reused when the conversation state key matches
+    exactly, so a reply is never served for a different set of collected
+    appointment details. Messages are matched by normalized text, or by
+    embedding similarity when sentence-transformers is installed.
+    
+    Entries are appended to a JSON Lines file when a path is given, so
+    turns cached in one session can be reused by later sessions.
+    Embeddings are computed on lookup, and only when an entry for the
+    same conversation state exists.
+    """
+    
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: float = 0.95,
+        max_entries: int = 256,
+        model_name: str = 'sentence-transformers/all-MiniLM-L6-v2'
+    ):
+        """
+        Initialize the response cache
+        
+        Args:
+            path: JSON Lines file to persist entries to (default: in-memory only)
+            threshold: Minimum cosine similarity for a semantic hit (default: 0.95)
+            max_entries: Maximum number of cached turns (default: 256)
+            model_name: Sentence embedding model (default: all-MiniLM-L6-v2)
+        """
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.model_name = model_name
+        self._model: Optional[Any] = None
+        self._model_failed = SentenceTransformer is None
+        self._lock = threading.Lock()
+        
+        # Entries are [context_key, normalized text, cached turn, embedding or None];
+        # the persisted file is read on first use
+        self._entries: Deque[List[Any]] = deque(maxlen=max_entries)
+        self._loaded = path is None
+    
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """
+        Normalize a message for exact comparison
+        
+        Args:
+            text: User message
+        
+        Returns:
+            Lowercased message without punctuation or repeated whitespace
+        """
+        return _WHITESPACE_RE.sub(' ', _NON_WORD_RE.sub(' ', text.lower())).strip()
+    
+    def _embed(self, text: str) -> Optional[Any]:
+        """
+        Embed a normalized message, loading the model on first use
+        
+        Args:
+            text: Normalized message
+        
+        Returns:
+            Normalized embedding vector or None if embeddings are unavailable
+        """
+        if self._model_failed:
+            return None
+        
+        try:
+            if self._model is None:
+                self._model = SentenceTransformer(self.model_name)
+            return self._model.encode(text, normalize_embeddings=True)
+        
+        except Exception as e:
+            logger.warning(f"Sentence embeddings unavailable, using exact matching: {str(e)}")
+            self._model_failed = True
+            return None
+    
+    def _load(self) -> None:
+        """Read persisted entries, compacting the file if it outgrew max_entries"""
+        if self._loaded:
+            return
+        self._loaded = True
+        
+        lines = 0
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    record = json.loads(line)
+                    self._entries.append([record['key'], record['text'], (record['reply'], record['data']), None])
+                    lines += 1
+        
+        except FileNotFoundError:
+            return
+        
+        except Exception as e:
+            logger.warning(f"Error reading response cache {self.path}: {str(e)}")
+        
+        if lines > self.max_entries:
+            self._write_records(list(self._entries), 'w')
+    
+    def _write_records(self, entries: List[List[Any]], mode: str) -> None:
+        """
+        Write entries to the persisted file
+        
+        Args:
+            entries: Entries to write
+            mode: File mode, 'a' to append or 'w' to rewrite
+        """
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, mode, encoding='utf-8') as f:
+                for key, text, (reply, data), _ in entries:
+                    f.write(json.dumps({'key': key, 'text': text, 'reply': reply, 'data': data}) + '\n')
+        
+        except Exception as e:
+            logger.warning(f"Error writing response cache {self.path}: {str(e)}")
+    
+    def get(self, user_input: str, context_key: str) -> Optional[Tuple[str, Dict[str, str]]]:
+        """
+        Look up a cached turn for a user message
+        
+        Args:
+            user_input: User message
+            context_key: Key describing the conversation state
+        
+        Returns:
+            Tuple of (reply, appointment data) or None on a cache miss
+        """
+        normalized = self._normalize(user_input)
+        
+        with self._lock:
+            self._load()
+            candidates = [entry for entry in self._entries if entry[0] == context_key]
+        
+        for _, text, turn, _ in candidates:
+            if text == normalized:
+                return turn
+        
+        # Only embed the message when an entry for the same state exists
+        if not candidates:
+            return None
+        
+        embedding = self._embed(normalized)
+        if embedding is None:
+            return None
+        
+        best_score, best_turn = 0.0, None
+        for entry in candidates:
+            if entry[3] is None:
+                entry[3] = self._embed(entry[1])
+                if entry[3] is None:
+                    return None
+            
+            score = float(embedding @ entry[3])
+            if score > best_score:
+                best_score, best_turn = score, entry[2]
+        
+        if best_turn is not None and best_score >= self.threshold:
+            return best_turn
+        
+        return None
+    
+    def put(self, user_input: str, context_key: str, reply: str, appointment_data: Dict[str, str]) -> None:
+        """
+        Cache an assistant turn for a user message
+        
+        Only cache turns that collected no new appointment details: similar
+        messages may reuse the turn, and "my name is John" and "my name is
+        Joan" embed almost identically.
+        
+        Args:
+            user_input: User message
+            context_key: Key describing the conversation state
+            reply: Assistant's reply
+            appointment_data: Appointment data returned with the reply
+        """
+        entry = [context_key, self._normalize(user_input), (reply, dict(appointment_data)), None]
+        
+        with self._lock:
+            self._load()
+            self._entries.append(entry)
+            if self.path is not None:
+                self._write_records([entry], 'a')
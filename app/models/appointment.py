@@ -2,13 +2,18 @@
 Models for appointment data
 """
 
-import uuid
+import secrets
 import datetime
 from typing import Dict, Any, Optional
 
 class Appointment:
     """Model for an appointment"""
     
+    __slots__ = (
+        'id', 'patient_name', 'consultation_type', 'reason', 'date', 'time',
+        'phone', 'email', 'status', 'calendly_event_id', 'created_at'
+    )
+    
     def __init__(
         self,
         patient_name: str,
@@ -20,7 +25,8 @@ class Appointment:
         email: str,
         status: str = "Pending",
         calendly_event_id: Optional[str] = None,
-        id: Optional[str] = None
+        id: Optional[str] = None,
+        created_at: Optional[str] = None
     ):
         """
         Initialize an appointment
@@ -36,8 +42,9 @@ class Appointment:
             status: Appointment status (default: "Pending")
             calendly_event_id: Calendly event ID (default: None)
             id: Appointment ID (default: auto-generated)
+            created_at: Creation timestamp in ISO format (default: now)
         """
-        self.id = id or f"appt-{uuid.uuid4().hex[:8]}"
+        self.id = id or f"appt-{secrets.token_hex(4)}"
         self.patient_name = patient_name
         self.consultation_type = consultation_type
         self.reason = reason
@@ -47,7 +54,7 @@ class Appointment:
         self.email = email
         self.status = status
         self.calendly_event_id = calendly_event_id
-        self.created_at = datetime.datetime.now().isoformat()
+        self.created_at = created_at or datetime.datetime.now().isoformat()
     
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -91,5 +98,6 @@ class Appointment:
             phone=data.get("phone", ""),
             email=data.get("email", ""),
             status=data.get("status", "Pending"),
-            calendly_event_id=data.get("calendly_event_id")
+            calendly_event_id=data.get("calendly_event_id"),
+            created_at=data.get("created_at")
         )
\ No newline at end of file
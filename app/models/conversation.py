@@ -0,0 +1,42 @@
+"""
+Models for structured conversation turns
+"""
+
+from typing import Dict
+
+from pydantic import BaseModel, Field
+
+class AppointmentFields(BaseModel):
+    """Appointment details collected so far in the conversation"""
+    
+    name: str = Field(default="", description="Patient's full name, or empty if not provided yet")
+    consultation_type: str = Field(
+        default="",
+        description=(
+            "Specialty needed: one of General Medicine, Cardiology, Orthopedics, Pediatrics, "
+            "Neurology, Dermatology or Ophthalmology; empty if not provided yet"
+        )
+    )
+    reason: str = Field(default="", description="Reason for the visit, or empty if not provided yet")
+    date: str = Field(default="", description="Preferred date in YYYY-MM-DD format, or empty if not provided yet")
+    time: str = Field(default="", description="Preferred time, e.g. 10:30 AM, or empty if not provided yet")
+    phone: str = Field(default="", description="Patient's phone number, or empty if not provided yet")
+    email: str = Field(default="", description="Patient's email address, or empty if not provided yet")
+    
+    def to_dict(self) -> Dict[str, str]:
+        """
+        Convert the collected fields to a dictionary
+        
+        Returns:
+            Dictionary with only the fields that have a value
+        """
+        return {field: value.strip() for field, value in self.model_dump().items() if value and value.strip()}
+
+class TurnOutput(BaseModel):
+    """Assistant reply together with the appointment details collected so far"""
+    
+    reply: str = Field(description="The assistant's reply to the user")
+    fields: AppointmentFields = Field(
+        default_factory=AppointmentFields,
+        description="All appointment details the user has provided so far in the conversation"
+    )
@@ -0,0 +1,95 @@
+"""
+Date and time parsing utilities for the Hospital Appointment System
+"""
+
+import re
+import datetime
+import functools
+from typing import Optional
+
+__all__ = ["parse_date", "parse_time"]
+
+# Matches times like "13:00", "1:00 PM", "1 PM", "1:00PM" and "1PM"
+_TIME_RE = re.compile(r'^\s*(\d{1,2})(?::(\d{2}))?\s*([AaPp][Mm])?\s*$')
+
+@functools.lru_cache(maxsize=2048)
+def parse_time(time_str: Optional[str]) -> Optional[datetime.time]:
+    """
+    Parse a time string in a single regex pass
+    
+    Args:
+        time_str: Time string in 24-hour ("13:00") or 12-hour ("1:00 PM", "1PM") format
+    
+    Returns:
+        Parsed time or None if the string is not a valid time
+    """
+    match = _TIME_RE.match(time_str or "")
+    if not match:
+        return None
+    
+    hour = int(match.group(1))
+    minute = int(match.group(2) or 0)
+    meridiem = (match.group(3) or "").lower()
+    
+    if meridiem:
+        # 12-hour clock
+        if not 1 <= hour <= 12:
+            return None
+        if meridiem == "pm" and hour != 12:
+            hour += 12
+        elif meridiem == "am" and hour == 12:
+            hour = 0
+    elif match.group(2) is None:
+        # A bare hour without minutes or AM/PM is ambiguous
+        return None
+    
+    if hour > 23 or minute > 59:
+        return None
+    
+    return datetime.time(hour, minute)
+
+# Supported date shapes
+_DATE_ISO_RE = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$')            # 2025-03-10
+_DATE_SLASH_RE = re.compile(r'^(\d{1,2})/(\d{1,2})/(\d{4})$')          # 10/03/2025 or 03/10/2025
+_DATE_WORD_RE = re.compile(r'^([A-Za-z]{3,9})\s+(\d{1,2}),\s*(\d{4})$')  # March 10, 2025 or Mar 10, 2025
+
+@functools.lru_cache(maxsize=2048)
+def parse_date(date_str: Optional[str]) -> Optional[datetime.date]:
+    """
+    Parse a date string by classifying its shape and parsing it once
+    
+    Slash dates are read day-first (10/03/2025 is 10 March) and fall back to
+    month-first when the day-first reading is not a valid date.
+    
+    Args:
+        date_str: Date string in one of the supported formats
+    
+    Returns:
+        Parsed date or None if the string is not a valid date
+    """
+    date_str = (date_str or "").strip()
+    
+    try:
+        match = _DATE_ISO_RE.match(date_str)
+        if match:
+            year, month, day = map(int, match.groups())
+            return datetime.date(year, month, day)
+        
+        match = _DATE_SLASH_RE.match(date_str)
+        if match:
+            first, second, year = map(int, match.groups())
+            if second > 12:
+                return datetime.date(year, first, second)
+            return datetime.date(year, second, first)
+        
+        match = _DATE_WORD_RE.match(date_str)
+        if match:
+            # Rebuilt from the groups, since strptime needs a space after the comma
+            month, day, year = match.groups()
+            fmt = "%b %d %Y" if len(month) == 3 else "%B %d %Y"
+            return datetime.datetime.strptime(f"{month} {day} {year}", fmt).date()
+    
+    except ValueError:
+        pass
+    
+    return None
@@ -3,18 +3,29 @@ Logging utilities for the Hospital Appointment System
 """
 
 import os
+import queue
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Optional
+
+# Background listener that formats and writes queued log records
+_listener: Optional[QueueListener] = None
 
 def setup_logging(debug: bool = False, log_file: str = "logs/app.log") -> None:
     """
     Set up logging configuration
     
+    Records are put on a queue by the calling thread and formatted and
+    written by a background listener thread.
+    
     Args:
         debug: Enable debug mode
         log_file: Path to log file
     """
+    global _listener
+    
     # Create logs directory if it doesn't exist
     log_dir = os.path.dirname(log_file)
     os.makedirs(log_dir, exist_ok=True)
@@ -22,12 +33,8 @@ def setup_logging(debug: bool = False, log_file: str = "logs/app.log") -> None:
     # Set the log level
     log_level = logging.DEBUG if debug else logging.INFO
     
-    # Configure root logger
-    logging.basicConfig(
-        level=log_level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    # One formatter shared by all handlers
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     
     # Create a file handler
     file_handler = RotatingFileHandler(
@@ -36,12 +43,39 @@ def setup_logging(debug: bool = False, log_file: str = "logs/app.log") -> None:
         backupCount=5
     )
     file_handler.setLevel(log_level)
-    file_handler.setFormatter(logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    ))
+    file_handler.setFormatter(formatter)
+    handlers = [file_handler]
+    
+    # Echo log records to the console only in debug mode
+    if debug:
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(log_level)
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
     
-    # Add the file handler to the root logger
-    logging.getLogger('').addHandler(file_handler)
+    # Replace a listener from an earlier call
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+    
+    # Route the root logger through the queue to the background listener
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    
+    root_logger = logging.getLogger('')
+    root_logger.setLevel(log_level)
+    for handler in [h for h in root_logger.handlers if isinstance(h, QueueHandler)]:
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(QueueHandler(log_queue))
+
+def _stop_listener() -> None:
+    """Flush queued log records on interpreter exit"""
+    if _listener is not None:
+        _listener.stop()
+
+atexit.register(_stop_listener)
 
 def get_logger(name: str) -> logging.Logger:
     """
@@ -32,6 +32,15 @@ OPTIONAL_ENV_VARS = {
 # Calendly API configuration
 CALENDLY_BASE_URL = "https://api.calendly.com"
 
+# Calendly response cache lifetimes (in seconds)
+CALENDLY_AVAILABILITY_CACHE_TTL = 60
+CALENDLY_EVENT_TYPES_CACHE_TTL = 300
+CALENDLY_CACHE_MAX_SIZE = 512
+
+# Calendly HTTP connection settings
+CALENDLY_REQUEST_TIMEOUT = 10  # seconds
+CALENDLY_MAX_RETRIES = 2
+
 # Specialty to event type mapping
 SPECIALTY_EVENT_TYPES = {
     # Replace these with actual event type IDs from your Calendly account
@@ -44,6 +53,11 @@ SPECIALTY_EVENT_TYPES = {
     'Ophthalmology': 'your_ophthalmology_event_type_id',
 }
 
+# Response cache for near-duplicate user turns early in a conversation
+RESPONSE_CACHE_SIMILARITY = 0.95
+RESPONSE_CACHE_MAX_TURNS = 3
+RESPONSE_CACHE_FILE = 'response_cache.jsonl'  # inside DATA_DIR
+
 # Clinic operating hours
 CLINIC_HOURS = {
     'Monday': {'start': '09:00', 'end': '17:00'},
@@ -55,6 +69,9 @@ CLINIC_HOURS = {
     'Sunday': {'start': None, 'end': None},  # Closed
 }
 
+# Maximum number of concurrent SMTP connections for batch sends
+EMAIL_MAX_WORKERS = 8
+
 # Email templates
 EMAIL_TEMPLATES = {
     'confirmation': {
@@ -0,0 +1,36 @@
+"""
+Tests for the appointment scheduling tool
+"""
+
+from app.agent.tools import _parse_appointment_info
+
+APPOINTMENT_INFO = (
+    "Patient Name: John Smith\n"
+    "Consultation Type: Cardiology\n"
+    "Reason for Visit: Chest pain\n"
+    "Preferred Date: 2025-06-12\n"
+    "Preferred Time: 10:30 AM\n"
+    "Phone Number: 555-123-4567\n"
+    "Email Address: john@example.com\n"
+)
+
+EXPECTED_FIELDS = {
+    "name": "John Smith",
+    "consultation": "Cardiology",
+    "reason": "Chest pain",
+    "date_str": "2025-06-12",
+    "time_str": "10:30 AM",
+    "phone": "555-123-4567",
+    "email": "john@example.com",
+}
+
+def test_parse_appointment_info():
+    assert _parse_appointment_info(APPOINTMENT_INFO) == EXPECTED_FIELDS
+
+def test_parse_appointment_info_with_prefix():
+    info = f"Schedule this hospital appointment: {APPOINTMENT_INFO}"
+    assert _parse_appointment_info(info) == EXPECTED_FIELDS
+
+def test_parse_appointment_info_numbered_lines():
+    info = "\n".join(f"{i}. {line}" for i, line in enumerate(APPOINTMENT_INFO.splitlines(), 1))
+    assert _parse_appointment_info(info) == EXPECTED_FIELDS
@@ -0,0 +1,79 @@
+"""
+Tests for the Calendly API client
+"""
+
+from app.api.calendly import CalendlyAPI
+
+class FakeResponse:
+    def __init__(self, data):
+        self._data = data
+    
+    def raise_for_status(self):
+        pass
+    
+    def json(self):
+        return self._data
+
+class FakeSession:
+    """Stands in for requests.Session, recording the calls made"""
+    
+    def __init__(self, slots):
+        self.slots = slots
+        self.get_calls = 0
+        self.post_calls = 0
+    
+    def get(self, url, params=None, timeout=None):
+        self.get_calls += 1
+        return FakeResponse({"data": self.slots})
+    
+    def post(self, url, json=None, timeout=None):
+        self.post_calls += 1
+        return FakeResponse({"data": {"id": "EVT123"}})
+
+def make_api(slots):
+    api = CalendlyAPI()
+    api._session = FakeSession(slots)
+    return api
+
+SLOTS = [
+    {"status": "available", "start_time": "2025-06-12T14:00:00.000000Z"},
+    {"status": "available", "start_time": "2025-06-12T15:30:00.000000Z"},
+]
+
+def test_requested_time_matches_calendly_slot():
+    api = make_api(SLOTS)
+    
+    assert api.check_time_availability("Cardiology", "2025-06-12", "2 PM") == (True, [])
+
+def test_unavailable_time_returns_alternatives():
+    api = make_api(SLOTS)
+    
+    assert api.check_time_availability("Cardiology", "2025-06-12", "10:00 AM") == (False, ["02:00 PM", "03:30 PM"])
+
+def test_repeated_lookup_is_served_from_cache():
+    api = make_api(SLOTS)
+    
+    api.check_time_availability("Cardiology", "2025-06-12", "2 PM")
+    api.check_time_availability("Cardiology", "June 12, 2025", "3:30 PM")
+    
+    assert api.session.get_calls == 1
+
+def test_create_event_invalidates_cached_date():
+    api = make_api(SLOTS)
+    api.check_time_availability("Cardiology", "2025-06-12", "2 PM")
+    
+    result = api.create_event({
+        "name": "John Smith",
+        "email": "john@example.com",
+        "phone": "555-123-4567",
+        "consultation_type": "Cardiology",
+        "reason": "Chest pain",
+        "date": "2025-06-12",
+        "time": "2 PM"
+    })
+    
+    assert result == {"success": True, "data": {"id": "EVT123"}}
+    assert (api.get_specialty_event_type("Cardiology"), "2025-06-12") not in api._avail_cache
+    
+    api.check_time_availability("Cardiology", "2025-06-12", "2 PM")
+    assert api.session.get_calls == 2
@@ -0,0 +1,26 @@
+"""
+Tests for the email service
+"""
+
+from app.api.email_service import EmailService, _load_template_cached
+
+TEMPLATE = (
+    "<html><head><style>body { font-family: Arial; } .box { padding: 10px; }</style></head>"
+    "<body><p>Dear {{patient_name}},</p><p>{{unknown_key}}</p></body></html>"
+)
+
+def test_render_template_with_css_and_placeholders(tmp_path):
+    path = tmp_path / "confirmation_email.html"
+    path.write_text(TEMPLATE)
+    _load_template_cached.cache_clear()
+    
+    template = _load_template_cached(str(path))
+    rendered = EmailService()._render_template(template, {"patient_name": "John Smith"})
+    
+    assert rendered == (
+        "<html><head><style>body { font-family: Arial; } .box { padding: 10px; }</style></head>"
+        "<body><p>Dear John Smith,</p><p>{{unknown_key}}</p></body></html>"
+    )
+
+def test_missing_template_returns_none(tmp_path):
+    assert _load_template_cached(str(tmp_path / "missing.html")) is None
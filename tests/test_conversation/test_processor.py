@@ -0,0 +1,72 @@
+"""
+Tests for the conversation processor
+"""
+
+import pytest
+
+from app.conversation.processor import ConversationProcessor
+
+def test_extract_fields_from_keeps_earlier_values():
+    processor = ConversationProcessor()
+    conversation = [
+        "User: Hi, I need a Cardiology consultation.",
+        "Bot: Sure. We offer General Medicine, Cardiology, Orthopedics, Pediatrics. What is your name?",
+        "User: My name is Ann Lee",
+    ]
+    
+    appointment_data = processor.extract_fields_from(conversation)
+    
+    assert appointment_data["consultation_type"] == "Cardiology"
+    assert appointment_data["name"] == "Ann Lee"
+
+def test_extract_fields_from_ignores_blank_summary_values():
+    processor = ConversationProcessor()
+    summary = (
+        "Bot: Patient Name: Ann Lee\n"
+        "Consultation Type: Cardiology\n"
+        "Reason for Visit: \n"
+        "Preferred Date: \n"
+        "Preferred Time: \n"
+        "Phone Number: \n"
+        "Email Address: "
+    )
+    
+    appointment_data = processor.extract_fields_from([summary], {"phone": "555-111-2222"})
+    
+    assert appointment_data == {"name": "Ann Lee", "consultation_type": "Cardiology", "phone": "555-111-2222"}
+
+def test_extract_fields_from_lets_user_correct_values():
+    processor = ConversationProcessor()
+    appointment_data = {}
+    
+    for message in ["User: at 10 AM please", "Bot: ok", "User: actually at 3 PM"]:
+        appointment_data = processor.extract_fields_from([message], appointment_data)
+    
+    assert appointment_data["time"] == "3 PM"
+
+PREFILTER_SAMPLES = [
+    "User: Hi, I need a Cardiology consultation.",
+    "User: My name is Ann Lee and you can call me at 555-123-4567",
+    "User: I'm having chest pain, can I come next Friday at 10 AM?",
+    "User: email: ann.lee@example.com",
+    "User: The reason is a sprained ankle. Date: 2025-06-12, time: 3:30 PM",
+    "User: I want to see a neurology specialist on March 3rd",
+    "Bot: Patient Name: Ann Lee\nConsultation Type: Cardiology\nReason for Visit: Chest pain",
+    "User: suffering from migraines, contact me at ann@example.org",
+    "User: hi there",
+    "Bot: We offer General Medicine, Cardiology, Orthopedics, Pediatrics and Dermatology.",
+    "User: PHONE NUMBER IS: (555) 987-6543. CALL ME ANN",
+    "User: visiting for a checkup tomorrow at 9",
+    "User: Café visit, name is José",
+]
+
+def test_hyperscan_prefilter_matches_re():
+    pytest.importorskip("hyperscan")
+    processor = ConversationProcessor()
+    assert processor._hs_db is not None
+    
+    reference = ConversationProcessor()
+    reference._hs_db = None
+    
+    for message in PREFILTER_SAMPLES:
+        assert processor._extract_fields(message) == reference._extract_fields(message), message
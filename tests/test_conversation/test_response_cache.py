@@ -0,0 +1,43 @@
+"""
+Tests for the response cache
+"""
+
+import pytest
+
+from app.conversation import response_cache
+from app.conversation.response_cache import ResponseCache
+
+@pytest.fixture(autouse=True)
+def no_embeddings(monkeypatch):
+    # Exact matching only; never load a sentence embedding model in tests
+    monkeypatch.setattr(response_cache, "SentenceTransformer", None)
+
+def test_exact_hit_ignores_case_and_punctuation():
+    cache = ResponseCache()
+    cache.put("Hi!", "state", "Hello, how can I help?", {})
+    
+    assert cache.get("hi", "state") == ("Hello, how can I help?", {})
+
+def test_miss_for_different_state():
+    cache = ResponseCache()
+    cache.put("Hi!", "state", "Hello, how can I help?", {})
+    
+    assert cache.get("hi", "other state") is None
+    assert cache.get("hello there", "state") is None
+
+def test_entries_persist_across_instances(tmp_path):
+    path = str(tmp_path / "cache" / "response_cache.jsonl")
+    ResponseCache(path=path).put("What are your hours?", "state", "We are open 9 to 5.", {})
+    
+    assert ResponseCache(path=path).get("what are your hours", "state") == ("We are open 9 to 5.", {})
+
+def test_persisted_file_is_compacted(tmp_path):
+    path = tmp_path / "response_cache.jsonl"
+    cache = ResponseCache(path=str(path), max_entries=2)
+    for i in range(4):
+        cache.put(f"message {i}", "state", f"reply {i}", {})
+    
+    reloaded = ResponseCache(path=str(path), max_entries=2)
+    assert reloaded.get("message 0", "state") is None
+    assert reloaded.get("message 3", "state") == ("reply 3", {})
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
@@ -0,0 +1,58 @@
+"""
+Tests for the date and time parsing utilities
+"""
+
+import datetime
+
+import pytest
+
+from app.utils.date_parser import parse_date, parse_time
+
+@pytest.mark.parametrize("time_str, expected", [
+    ("13:00", datetime.time(13, 0)),
+    ("10:30", datetime.time(10, 30)),
+    ("1:00 PM", datetime.time(13, 0)),
+    ("1PM", datetime.time(13, 0)),
+    (" 2 pm ", datetime.time(14, 0)),
+    ("12 AM", datetime.time(0, 0)),
+    ("12:00 pm", datetime.time(12, 0)),
+])
+def test_parse_time(time_str, expected):
+    assert parse_time(time_str) == expected
+
+@pytest.mark.parametrize("time_str", [
+    "13 PM",   # 12-hour clock out of range
+    "0 AM",
+    "10",      # bare hour is ambiguous
+    "24:00",
+    "9:60",
+    "noon",
+    "",
+    None,
+])
+def test_parse_time_rejects_invalid(time_str):
+    assert parse_time(time_str) is None
+
+@pytest.mark.parametrize("date_str, expected", [
+    ("2025-03-10", datetime.date(2025, 3, 10)),
+    ("2025-3-7", datetime.date(2025, 3, 7)),
+    ("10/03/2025", datetime.date(2025, 3, 10)),   # day-first
+    ("03/13/2025", datetime.date(2025, 3, 13)),   # month-first when the second number is above 12
+    ("March 10, 2025", datetime.date(2025, 3, 10)),
+    ("March 10,2025", datetime.date(2025, 3, 10)),
+    ("Mar 10, 2025", datetime.date(2025, 3, 10)),
+    (" March 10,  2025 ", datetime.date(2025, 3, 10)),
+])
+def test_parse_date(date_str, expected):
+    assert parse_date(date_str) == expected
+
+@pytest.mark.parametrize("date_str", [
+    "2025-02-30",
+    "13/13/2025",
+    "Sept 10, 2025",
+    "tomorrow",
+    "",
+    None,
+])
+def test_parse_date_rejects_invalid(date_str):
+    assert parse_date(date_str) is None